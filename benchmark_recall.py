@@ -0,0 +1,119 @@
+import time
+import pandas as pd
+from ast import literal_eval
+from typing import Dict, List
+from qdrant_client import QdrantClient, models
+
+from init_qdrant import COLLECTION_PROFILE
+
+def query_ids(qclient: QdrantClient, collection_name: str, query: List[float], top_k: int, search_params: models.SearchParams) -> List[int]:
+    """
+    Runs a search with the given search params and returns the ids of the nearest points.
+
+    Args:
+        qclient: An instance of the Qdrant client used to interact with the Qdrant server.
+        collection_name: The name of the collection to search in.
+        query: The query embedding.
+        top_k: The number of nearest points to retrieve.
+        search_params: The Qdrant search params of the search.
+
+    Returns:
+        The ids of the nearest points ordered by score.
+    """
+
+    response = qclient.query_points(
+        collection_name=collection_name,
+        query=query,
+        limit=top_k,
+        search_params=search_params,
+        with_payload=False
+    )
+    return [point.id for point in response.points]
+
+def benchmark_recall(qclient: QdrantClient, collection_name: str, queries: List[List[float]], query_point_ids: List[int], top_k: int, search_params: models.SearchParams) -> Dict[str, float]:
+    """
+    Measures the recall of approximate searches against exact searches, along with their mean latencies.
+    The queries are vectors of the collection, so the point of each query is left out of both results
+    (one more point is retrieved to make up for it), otherwise it would always count as a hit.
+
+    Args:
+        qclient: An instance of the Qdrant client used to interact with the Qdrant server.
+        collection_name: The name of the collection to search in.
+        queries: The query embeddings.
+        query_point_ids: The id of the point of each query in the collection.
+        top_k: The number of nearest points retrieved by each search.
+        search_params: The Qdrant search params of the approximate searches.
+
+    Returns:
+        A dict with the mean recall@top_k and the mean latencies, in milliseconds, of both search types.
+    """
+
+    exact_params = models.SearchParams(exact=True)
+
+    recalls = []
+    approx_time = 0.0
+    exact_time = 0.0
+    for query, query_point_id in zip(queries, query_point_ids):
+        start_time = time.perf_counter()
+        exact_ids = query_ids(qclient, collection_name, query, top_k + 1, exact_params)
+        exact_time += time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        approx_ids = query_ids(qclient, collection_name, query, top_k + 1, search_params)
+        approx_time += time.perf_counter() - start_time
+
+        exact_ids = [point_id for point_id in exact_ids if point_id != query_point_id][:top_k]
+        approx_ids = [point_id for point_id in approx_ids if point_id != query_point_id][:top_k]
+
+        recalls.append(len(set(exact_ids) & set(approx_ids)) / len(exact_ids) if exact_ids else 1.0)
+
+    return {
+        "recall": sum(recalls) / len(recalls),
+        "approx_ms": approx_time / len(queries) * 1000,
+        "exact_ms": exact_time / len(queries) * 1000
+    }
+
+def main():
+    num_queries = 100
+    top_k = 10
+    collection_name = "movie_collection"
+
+    qclient = QdrantClient(url="http://localhost:6333")
+    embeddings_df = pd.read_csv("data/embeddings/movie_embeddings.csv")
+    search_params = COLLECTION_PROFILE.search_params()
+
+    # The point id of each row is its index in the embeddings file.
+    sample_df = embeddings_df.sample(n=min(num_queries, len(embeddings_df)), random_state=0)
+    queries = sample_df["embedding"].apply(literal_eval).tolist()
+    query_point_ids = sample_df.index.tolist()
+
+    variants = {
+        "configured": search_params,
+        "no rescore": models.SearchParams(
+            hnsw_ef=search_params.hnsw_ef,
+            quantization=models.QuantizationSearchParams(rescore=False)
+        ),
+        "ef=64": models.SearchParams(
+            hnsw_ef=64,
+            quantization=search_params.quantization
+        ),
+        "ef=256": models.SearchParams(
+            hnsw_ef=256,
+            quantization=search_params.quantization
+        )
+    }
+
+    print(f"Recall@{top_k} against exact search on {collection_name} with {len(queries)} queries")
+    for name, variant_params in variants.items():
+        result = benchmark_recall(
+            qclient=qclient,
+            collection_name=collection_name,
+            queries=queries,
+            query_point_ids=query_point_ids,
+            top_k=top_k,
+            search_params=variant_params
+        )
+        print(f"{name}: recall {result["recall"]:.4f}, approximate {result["approx_ms"]:.2f} ms, exact {result["exact_ms"]:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+import argparse
 import torch
 from transformers import AutoTokenizer, AutoModel
 from qdrant_client import QdrantClient
@@ -6,7 +7,8 @@ from qdrant_client import QdrantClient
 from init_cleaning import clean_movie_data
 from init_descriptions import create_movie_text_description, create_user_text_description
 from init_embeddings import generate_embeddings
-from init_qdrant import initialize_collection
+from init_qdrant import COLLECTION_PROFILE, initialize_collection
+from init_pipeline import run_streaming_pipeline
 
 def ensure_folder_structure(base_path="data"):
     subfolders = ["cleaned", "descriptions", "embeddings", "initial"]
@@ -19,7 +21,7 @@ def ensure_folder_structure(base_path="data"):
         if not os.path.exists(folder_path):
             os.makedirs(folder_path)
 
-def main():
+def main(streaming: bool = False, recreate: bool = False):
     ensure_folder_structure()
 
     clean_movie_data(
@@ -42,6 +44,38 @@ def main():
     model = AutoModel.from_pretrained("dunzhang/stella_en_1.5B_v5")
     print(f"Using device: {device}")
 
+    # https://qdrant.tech/documentation/quickstart/
+    qclient = QdrantClient(url="http://localhost:6333")
+
+    if recreate:
+        for collection_name in ["movie_collection", "user_collection"]:
+            if qclient.collection_exists(collection_name):
+                qclient.delete_collection(collection_name)
+                print(f"Deleted collection {collection_name}, it will be recreated.")
+
+    if streaming:
+        run_streaming_pipeline(
+            qclient=qclient,
+            branches=[
+                {
+                    "collection_name": "movie_collection",
+                    "details_filepath": "data/descriptions/movie_text_description.csv",
+                    "checkpoint_filepath": "data/embeddings/movie_embeddings.csv"
+                },
+                {
+                    "collection_name": "user_collection",
+                    "details_filepath": "data/descriptions/user_text_description.csv",
+                    "checkpoint_filepath": "data/embeddings/user_embeddings.csv"
+                }
+            ],
+            model=model,
+            tokenizer=tokenizer,
+            device=device,
+            max_limit=50000,
+            profile=COLLECTION_PROFILE
+        )
+        return
+
     generate_embeddings(
         input_filepath="data/descriptions/movie_text_description.csv",
         model=model,
@@ -59,21 +93,25 @@ def main():
         max_limit=50000
     )
 
-    # https://qdrant.tech/documentation/quickstart/
-    qclient = QdrantClient(url="http://localhost:6333")
-
     initialize_collection(
         qclient=qclient,
         collection_name="movie_collection",
         embeddings_filepath="data/embeddings/movie_embeddings.csv",
-        details_filepath="data/descriptions/movie_text_description.csv"
+        details_filepath="data/descriptions/movie_text_description.csv",
+        profile=COLLECTION_PROFILE
     )
     initialize_collection(
         qclient=qclient,
         collection_name="user_collection",
         embeddings_filepath="data/embeddings/user_embeddings.csv",
-        details_filepath="data/descriptions/user_text_description.csv"
+        details_filepath="data/descriptions/user_text_description.csv",
+        profile=COLLECTION_PROFILE
     )
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--streaming", action="store_true", help="Stream embeddings straight into Qdrant instead of running stage by stage.")
+    parser.add_argument("--recreate", action="store_true", help="Delete the existing Qdrant collections and create them again with the current profile.")
+    args = parser.parse_args()
+
+    main(streaming=args.streaming, recreate=args.recreate)
\ No newline at end of file
@@ -30,6 +30,32 @@ def get_embedding(text: str, model, tokenizer, device: str) -> List[float]:
 
     return output_embedding.tolist()
 
+def get_embeddings(texts: List[str], model, tokenizer, device: str) -> List[List[float]]:
+    """
+    Generates the embeddings of several texts in a single forward pass. The texts are padded on the 
+    right to the same length and each embedding is the mean of its own token embeddings, the padding 
+    tokens being excluded through the attention mask, so it matches the embedding of get_embedding.
+
+    Args:
+        texts: The input texts to embed.
+        model: The model used for generating embeddings.
+        tokenizer: The tokenizer corresponding to the model.
+        device: The device ("cpu" or "mps") to run the computation on.
+
+    Returns:
+        A list with the embedding of each input text, in the same order.
+    """
+
+    inputs = tokenizer(texts, return_tensors="pt", padding=True, padding_side="right").to(device)
+
+    with torch.no_grad():
+        outputs = model(**inputs)
+        mask = inputs["attention_mask"].unsqueeze(-1).to(outputs.last_hidden_state.dtype)
+        summed = (outputs.last_hidden_state * mask).sum(dim=1)
+        output_embeddings = (summed / mask.sum(dim=1)).cpu().numpy()
+
+    return output_embeddings.tolist()
+
 def generate_embeddings(input_filepath: str, model, tokenizer, device: str, output_filepath: str, max_limit: int = 50000) -> None:
     """
     Generates text embeddings for input data using a specified model and tokenizer, 
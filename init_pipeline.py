@@ -0,0 +1,385 @@
+import os
+import csv
+import json
+import time
+import queue
+import threading
+import pandas as pd
+from tqdm import tqdm
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from ast import literal_eval
+from qdrant_client import QdrantClient, models
+
+from init_embeddings import get_embeddings
+from init_qdrant import CollectionProfile, DEFAULT_PROFILE, create_collection, prepare_payload
+
+_STOP = object()
+_STOPPED = object()
+
+def read_checkpoint(checkpoint_filepath: str) -> List[Any]:
+    """
+    Reads the ids that have already been embedded, in the order they were written.
+
+    Args:
+        checkpoint_filepath: Path to the embeddings CSV file used as checkpoint.
+
+    Returns:
+        A list of ids already present in the checkpoint file, empty if the file does not exist.
+    """
+
+    if not os.path.exists(checkpoint_filepath) or os.path.getsize(checkpoint_filepath) == 0:
+        return []
+
+    return pd.read_csv(checkpoint_filepath, usecols=["id"])["id"].tolist()
+
+def stream_descriptions(input_filepath: str, skip_ids: set, limit: int, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Reads the descriptions CSV file in chunks and yields batches of records that still need to be embedded.
+
+    Args:
+        input_filepath: Path to the input CSV file containing data with "id" and "text" columns.
+        skip_ids: Ids that are already checkpointed and must not be embedded again.
+        limit: The maximum number of records to yield.
+        batch_size: The number of records in each yielded batch.
+
+    Returns:
+        An iterator over lists of description records.
+    """
+
+    if limit <= 0:
+        return
+
+    batch = []
+    emitted = 0
+    for chunk in pd.read_csv(input_filepath, chunksize=batch_size):
+        for record in chunk.to_dict("records"):
+            if record["id"] in skip_ids:
+                continue
+
+            batch.append(record)
+            emitted += 1
+
+            if len(batch) == batch_size or emitted == limit:
+                yield batch
+                batch = []
+
+            if emitted == limit:
+                return
+
+    if batch:
+        yield batch
+
+def _put(q: queue.Queue, item: Any, stop_event: threading.Event) -> bool:
+    """
+    Puts an item on a bounded queue, waiting for free space unless the pipeline is being stopped.
+
+    Args:
+        q: The queue to put the item on.
+        item: The item to enqueue.
+        stop_event: Event set when any stage of the pipeline fails.
+
+    Returns:
+        True if the item was enqueued, False if the pipeline was stopped while waiting.
+    """
+
+    while not stop_event.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _get(q: queue.Queue, stop_event: threading.Event) -> Any:
+    """
+    Gets an item from a queue, returning the stopped marker if the pipeline is being stopped.
+
+    Args:
+        q: The queue to read from.
+        stop_event: Event set when any stage of the pipeline fails.
+
+    Returns:
+        The next item of the queue or the stopped marker.
+    """
+
+    while not stop_event.is_set():
+        try:
+            return q.get(timeout=0.5)
+        except queue.Empty:
+            continue
+    return _STOPPED
+
+def run_collection_pipeline(
+    qclient: QdrantClient,
+    collection_name: str,
+    details_filepath: str,
+    model,
+    tokenizer,
+    device: str,
+    checkpoint_filepath: str,
+    max_limit: int = 50000,
+    batch_size: int = 64,
+    embed_batch_size: int = 8,
+    queue_size: int = 4,
+    profile: CollectionProfile = DEFAULT_PROFILE,
+    stop_event: Optional[threading.Event] = None,
+    embed_lock: Optional[threading.Lock] = None
+) -> None:
+    """
+    Streams descriptions through the embedder straight into Qdrant upserts for one collection.
+    The reader, embedder and uploader run as separate threads connected by bounded queues, so a slow
+    stage blocks the previous ones instead of buffering the whole dataset in memory. The texts are
+    embedded a few at a time in padded forward passes, each one holding the embed lock. Each batch is
+    appended to the embeddings CSV only after Qdrant acknowledged its upsert, which makes that file
+    the checkpoint an interrupted run resumes from. The embeddings CSV rows beyond the number of points
+    the collection actually holds (e.g. written by the stage by stage run) are uploaded before any new
+    embedding. The collection is created with the first batch and is queryable while the rest of the
+    data is still being ingested.
+
+    Args:
+        qclient: An instance of the Qdrant client used to interact with the Qdrant server.
+        collection_name: The name of the collection to fill in Qdrant.
+        details_filepath: Path to the CSV file containing "id", "text" and the other payload columns.
+        model: The model used for generating embeddings.
+        tokenizer: The tokenizer corresponding to the model.
+        device: The device to run the computation on.
+        checkpoint_filepath: Path to the embeddings CSV file, created if it does not exist.
+        max_limit: The maximum number of records in the collection. Defaults to 50,000.
+        batch_size: The number of points in each upsert. Defaults to 64.
+        embed_batch_size: The number of texts embedded in each forward pass. Defaults to 8.
+        queue_size: The maximum number of batches waiting between two stages. Defaults to 4.
+        profile: The storage settings of the collection and the payload fields to keep.
+        stop_event: Event stopping the pipeline when set, shared with other pipelines so that a failure
+                    stops all of them. A new event is created if not given.
+        embed_lock: Lock held during each forward pass, shared with other pipelines using the same model
+                    since inference is not thread-safe on every device (e.g. MPS). A new lock is created if not given.
+
+    Returns:
+        None
+    """
+
+    pipeline_start_time = time.time()
+
+    checkpointed_ids = read_checkpoint(checkpoint_filepath)
+    collection_exists = qclient.collection_exists(collection_name)
+    points_count = qclient.count(collection_name, exact=True).count if collection_exists else 0
+
+    if points_count >= max_limit:
+        print(f"Collection {collection_name} already contains {max_limit} or more records. Skipping...")
+        return
+
+    # Both runs give the i-th row of the embeddings CSV the point id i and upload the rows in order,
+    # so the collection holds a prefix of the CSV. The rows after that prefix (e.g. embeddings created
+    # by a stage by stage run that failed while uploading) are uploaded before the new ones.
+    backfill_count = min(len(checkpointed_ids), max_limit) - points_count
+    available_slots = max_limit - max(len(checkpointed_ids), points_count)
+
+    print(f"Starting streaming pipeline for collection {collection_name}...")
+
+    embed_lock = embed_lock if embed_lock is not None else threading.Lock()
+    with embed_lock:
+        model = model.to(device)
+
+    embed_queue = queue.Queue(maxsize=queue_size)
+    upload_queue = queue.Queue(maxsize=queue_size)
+    stop_event = stop_event if stop_event is not None else threading.Event()
+    errors = []
+
+    def fail(e: Exception) -> None:
+        errors.append(e)
+        stop_event.set()
+
+    def reader() -> None:
+        try:
+            if backfill_count > 0:
+                backfill_chunks = pd.read_csv(
+                    checkpoint_filepath,
+                    skiprows=range(1, points_count + 1),
+                    nrows=backfill_count,
+                    chunksize=batch_size
+                )
+                for chunk in backfill_chunks:
+                    vectors = [literal_eval(embedding) for embedding in chunk["embedding"]]
+                    item = ("backfill", chunk["id"].tolist(), vectors)
+                    if not _put(upload_queue, item, stop_event):
+                        return
+
+            batches = stream_descriptions(
+                input_filepath=details_filepath,
+                skip_ids=set(checkpointed_ids),
+                limit=available_slots,
+                batch_size=batch_size
+            )
+            for batch in batches:
+                if not _put(embed_queue, batch, stop_event):
+                    return
+        except Exception as e:
+            fail(e)
+        finally:
+            _put(embed_queue, _STOP, stop_event)
+
+    def embedder() -> None:
+        try:
+            while True:
+                batch = _get(embed_queue, stop_event)
+                if batch is _STOP or batch is _STOPPED:
+                    break
+
+                records, vectors = [], []
+                for start in range(0, len(batch), embed_batch_size):
+                    # The batch is not checkpointed yet, so it can be dropped when the pipeline stops.
+                    if stop_event.is_set():
+                        return
+
+                    sub_batch = batch[start:start + embed_batch_size]
+                    try:
+                        with embed_lock:
+                            vectors.extend(get_embeddings([record["text"] for record in sub_batch], model, tokenizer, device))
+                        records.extend(sub_batch)
+                    except Exception as e:
+                        print(f"Error processing element IDs {[record["id"] for record in sub_batch]}: {e}")
+
+                if records and not _put(upload_queue, ("new", records, vectors), stop_event):
+                    return
+        except Exception as e:
+            fail(e)
+        finally:
+            _put(upload_queue, _STOP, stop_event)
+
+    reader_thread = threading.Thread(target=reader, name=f"{collection_name}-reader", daemon=True)
+    embedder_thread = threading.Thread(target=embedder, name=f"{collection_name}-embedder", daemon=True)
+    reader_thread.start()
+    embedder_thread.start()
+
+    details_df = pd.read_csv(details_filepath).drop_duplicates("id").set_index("id", drop=False) if backfill_count > 0 else None
+    next_point_id = points_count
+    uploaded = 0
+    stopped = False
+
+    try:
+        with open(checkpoint_filepath, "a", newline="", encoding="utf-8") as f_checkpoint:
+            writer = csv.writer(f_checkpoint, quoting=csv.QUOTE_MINIMAL)
+
+            if f_checkpoint.tell() == 0:
+                writer.writerow(["id", "embedding"])
+
+            with tqdm(desc=f"Upserting {collection_name}") as pbar:
+                while True:
+                    item = _get(upload_queue, stop_event)
+                    if item is _STOP:
+                        break
+                    if item is _STOPPED:
+                        stopped = True
+                        break
+
+                    kind, entries, vectors = item
+                    if kind == "backfill":
+                        details = [details_df.loc[entry_id].to_dict() for entry_id in entries]
+                    else:
+                        details = entries
+                    payloads = [prepare_payload(row, profile.payload_fields) for row in details]
+
+                    if not collection_exists:
+                        create_collection(
+                            qclient=qclient,
+                            collection_name=collection_name,
+                            vector_len=len(vectors[0]),
+                            profile=profile
+                        )
+                        collection_exists = True
+
+                    points = [
+                        models.PointStruct(id=next_point_id + i, vector=vector, payload=payload)
+                        for i, (vector, payload) in enumerate(zip(vectors, payloads))
+                    ]
+                    qclient.upsert(collection_name=collection_name, points=points, wait=True)
+                    next_point_id += len(points)
+
+                    if kind == "new":
+                        for record, vector in zip(entries, vectors):
+                            writer.writerow([record["id"], json.dumps(vector)])
+                        f_checkpoint.flush()
+                        uploaded += len(points)
+
+                    pbar.update(len(points))
+    except Exception as e:
+        fail(e)
+    except BaseException:
+        stop_event.set()
+        raise
+    finally:
+        reader_thread.join()
+        embedder_thread.join()
+
+    if errors:
+        raise errors[0]
+
+    if stopped:
+        print(f"Streaming pipeline for collection {collection_name} stopped after upserting {uploaded} new points.")
+        return
+
+    pipeline_elapsed_time = time.time() - pipeline_start_time
+    print(f"Streaming pipeline for collection {collection_name} upserted {uploaded} new points in {pipeline_elapsed_time:.4f} seconds.\n\n")
+
+def run_streaming_pipeline(qclient: QdrantClient, branches: List[Dict[str, Any]], model, tokenizer, device: str, **pipeline_kwargs) -> None:
+    """
+    Runs the streaming pipeline of several independent collections concurrently, one thread per collection.
+    The model is shared between the branches and its forward passes are serialized by a shared lock, so
+    the branches overlap the reading and the upserts of one collection with the inference of the other.
+    A failure of one branch or a KeyboardInterrupt stops all the branches at their next forward pass.
+
+    Args:
+        qclient: An instance of the Qdrant client used to interact with the Qdrant server.
+        branches: A list of dicts with the "collection_name", "details_filepath" and "checkpoint_filepath" of each collection.
+        model: The model used for generating embeddings.
+        tokenizer: The tokenizer corresponding to the model.
+        device: The device to run the computation on.
+        **pipeline_kwargs: Extra arguments forwarded to run_collection_pipeline (max_limit, batch_size, embed_batch_size, queue_size, profile).
+
+    Returns:
+        None
+    """
+
+    errors: List[Tuple[str, Exception]] = []
+    stop_event = threading.Event()
+    embed_lock = threading.Lock()
+
+    model = model.to(device)
+
+    def run_branch(branch: Dict[str, Any]) -> None:
+        try:
+            run_collection_pipeline(
+                qclient=qclient,
+                model=model,
+                tokenizer=tokenizer,
+                device=device,
+                stop_event=stop_event,
+                embed_lock=embed_lock,
+                **branch,
+                **pipeline_kwargs
+            )
+        except Exception as e:
+            errors.append((branch["collection_name"], e))
+            stop_event.set()
+
+    threads = [
+        threading.Thread(target=run_branch, args=(branch,), name=f"{branch["collection_name"]}-pipeline", daemon=True)
+        for branch in branches
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=0.5)
+    except KeyboardInterrupt:
+        print("Stopping the streaming pipeline...")
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+        raise
+
+    if errors:
+        collection_name, error = errors[0]
+        raise RuntimeError(f"Streaming pipeline failed for collection {collection_name}") from error
@@ -2,11 +2,102 @@ import time
 from qdrant_client import models
 import numpy as np
 import pandas as pd
-from typing import List
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 from qdrant_client import QdrantClient
 from ast import literal_eval
 
-def create_collection(qclient: QdrantClient, collection_name: str, vector_len: int) -> None:
+@dataclass
+class CollectionProfile:
+    """
+    Storage and search settings of a Qdrant collection.
+
+    Attributes:
+        quantization: "none", "scalar" (int8) or "product" quantization of the stored vectors.
+        product_compression: Compression ratio used by product quantization.
+        quantized_always_ram: Keep the quantized vectors in RAM.
+        on_disk_vectors: Store the original float32 vectors on disk, they are only read for rescoring.
+        hnsw_m: Number of edges per node in the HNSW graph, None keeps the Qdrant default.
+        hnsw_ef_construct: Size of the candidate list while building the HNSW graph, None keeps the Qdrant default.
+        search_ef: Size of the candidate list at search time, None keeps the Qdrant default.
+        rescore: Rescore the quantized candidates with the original vectors.
+        oversampling: Factor by which the quantized search fetches more candidates before rescoring.
+        payload_fields: Fields of the details row stored as payload, None stores the whole row.
+        indexed_fields: Payload fields to index, mapped to their schema type.
+    """
+
+    quantization: str = "none"
+    product_compression: models.CompressionRatio = models.CompressionRatio.X16
+    quantized_always_ram: bool = True
+    on_disk_vectors: bool = False
+    hnsw_m: Optional[int] = None
+    hnsw_ef_construct: Optional[int] = None
+    search_ef: Optional[int] = None
+    rescore: bool = True
+    oversampling: float = 2.0
+    payload_fields: Optional[List[str]] = None
+    indexed_fields: Dict[str, models.PayloadSchemaType] = field(default_factory=dict)
+
+    def quantization_config(self) -> Optional[models.QuantizationConfig]:
+        """
+        Builds the Qdrant quantization config of the profile.
+
+        Returns:
+            The quantization config, or None if the vectors are not quantized.
+        """
+
+        if self.quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=self.quantized_always_ram
+                )
+            )
+        if self.quantization == "product":
+            return models.ProductQuantization(
+                product=models.ProductQuantizationConfig(
+                    compression=self.product_compression,
+                    always_ram=self.quantized_always_ram
+                )
+            )
+        if self.quantization == "none":
+            return None
+        raise ValueError(f"Unknown quantization {self.quantization}, expected none, scalar or product.")
+
+    def search_params(self) -> models.SearchParams:
+        """
+        Builds the Qdrant search params matching the profile.
+
+        Returns:
+            The search params to pass to query_points.
+        """
+
+        quantization = None
+        if self.quantization != "none":
+            quantization = models.QuantizationSearchParams(
+                rescore=self.rescore,
+                oversampling=self.oversampling
+            )
+
+        return models.SearchParams(hnsw_ef=self.search_ef, quantization=quantization)
+
+DEFAULT_PROFILE = CollectionProfile()
+
+COMPACT_PROFILE = CollectionProfile(
+    quantization="scalar",
+    on_disk_vectors=True,
+    hnsw_m=16,
+    hnsw_ef_construct=128,
+    search_ef=128,
+    payload_fields=["id"],
+    indexed_fields={"id": models.PayloadSchemaType.INTEGER}
+)
+
+# Profile the collections are created with by init_data and searched with by the recommendation system.
+COLLECTION_PROFILE = COMPACT_PROFILE
+
+def create_collection(qclient: QdrantClient, collection_name: str, vector_len: int, profile: CollectionProfile = DEFAULT_PROFILE) -> None:
     """
     Create a new collection in Qdrant with the specified name and vector length. 
     If the collection already exists, it is deleted and recreated.
@@ -14,20 +105,51 @@ def create_collection(qclient: QdrantClient, collection_name: str, vector_len: i
     Args:
         collection_name: The name of the collection to be created.
         vector_len: The length of the vectors that will be stored in this collection.
+        profile: The storage settings of the collection. Defaults to plain float32 vectors with default HNSW settings.
 
     Returns:
         None
     """
 
+    hnsw_config = None
+    if profile.hnsw_m is not None or profile.hnsw_ef_construct is not None:
+        hnsw_config = models.HnswConfigDiff(m=profile.hnsw_m, ef_construct=profile.hnsw_ef_construct)
+
     qclient.create_collection(
         collection_name=collection_name,
         vectors_config=models.VectorParams(
             size=vector_len,
             distance=models.Distance.COSINE,
+            on_disk=profile.on_disk_vectors,
         ),
+        hnsw_config=hnsw_config,
+        quantization_config=profile.quantization_config(),
     )
 
-def prepare_qdrant_points(embedding_df: pd.DataFrame, point_details_df: pd.DataFrame) -> List[models.PointStruct]:
+    for field_name, field_schema in profile.indexed_fields.items():
+        qclient.create_payload_index(
+            collection_name=collection_name,
+            field_name=field_name,
+            field_schema=field_schema
+        )
+
+def prepare_payload(details: dict, payload_fields: Optional[List[str]] = None) -> dict:
+    """
+    Select the fields of a details row that are stored as the payload of a point.
+
+    Args:
+        details: The details row of the point.
+        payload_fields: The fields to keep, None keeps the whole row.
+
+    Returns:
+        The payload of the point.
+    """
+
+    if payload_fields is None:
+        return details
+    return {key: details[key] for key in payload_fields}
+
+def prepare_qdrant_points(embedding_df: pd.DataFrame, point_details_df: pd.DataFrame, payload_fields: Optional[List[str]] = None) -> List[models.PointStruct]:
     """
     Prepare points for uploading to a Qdrant collection. Each point consists of an embedding vector 
     and its associated metadata (payload).
@@ -35,6 +157,7 @@ def prepare_qdrant_points(embedding_df: pd.DataFrame, point_details_df: pd.DataF
     Args:
         embedding_df: DataFrame containing embeddings with an identifier column.
         point_details_df: DataFrame containing detailed metadata for each point.
+        payload_fields: The detail columns stored as payload, None stores the whole row.
 
     Returns:
         A list of points ready to be uploaded to Qdrant.
@@ -42,7 +165,10 @@ def prepare_qdrant_points(embedding_df: pd.DataFrame, point_details_df: pd.DataF
 
     points = []
     for idx, row in embedding_df.iterrows():
-        details_dict = point_details_df.loc[point_details_df["id"] == row["id"]].iloc[0].to_dict()
+        details_dict = prepare_payload(
+            details=point_details_df.loc[point_details_df["id"] == row["id"]].iloc[0].to_dict(),
+            payload_fields=payload_fields
+        )
         points.append(
             models.PointStruct(
                 id=idx,
@@ -69,40 +195,50 @@ def upload_points(qclient: QdrantClient, collection_name: str, points: List[mode
         points=points
     )
 
-def initialize_collection(qclient: QdrantClient, collection_name: str, embeddings_filepath: str, details_filepath: str) -> None:
+def initialize_collection(qclient: QdrantClient, collection_name: str, embeddings_filepath: str, details_filepath: str, profile: CollectionProfile = DEFAULT_PROFILE) -> None:
     """
     Initializes a Qdrant collection by creating it (if it does not already exist) and uploading
-    data points with their embeddings and metadata.
+    data points with their embeddings and metadata. The i-th row of the embeddings file is stored
+    as the point with id i, so if the collection already exists (e.g. left partial by an interrupted
+    streaming run) only the rows beyond its number of points are uploaded.
 
     Args:
         qclient: An instance of the Qdrant client used to interact with the Qdrant server.
         collection_name: The name of the collection to initialize in Qdrant.
         embeddings_filepath: Path to the CSV file containing embeddings with "id" and "embedding" columns.
         details_filepath: Path to the CSV file containing metadata details for each embedding point.
+        profile: The storage settings of the collection and the payload fields to keep.
 
     Returns:
         None
     """
 
-    if qclient.collection_exists(collection_name):
+    collection_exists = qclient.collection_exists(collection_name)
+    points_count = qclient.count(collection_name, exact=True).count if collection_exists else 0
+
+    embeddings_df = pd.read_csv(embeddings_filepath)
+    if collection_exists and points_count >= len(embeddings_df):
         print(f"Collection {collection_name} already exists in Qdrant. Skipping...")
         return
     
     init_start_time = time.time()
-    print(f"Starting initializing collection {collection_name}...")
+    print(f"Starting initializing collection {collection_name} from point {points_count}...")
 
     data_df = pd.read_csv(details_filepath)
-    embeddings_df = pd.read_csv(embeddings_filepath)
+    embeddings_df = embeddings_df.iloc[points_count:].copy()
     embeddings_df["embedding"] = embeddings_df["embedding"].apply(literal_eval)
-    create_collection(
-        qclient=qclient,
-        collection_name=collection_name,
-        vector_len=len(embeddings_df.iloc[0]["embedding"])
-    )
+    if not collection_exists:
+        create_collection(
+            qclient=qclient,
+            collection_name=collection_name,
+            vector_len=len(embeddings_df.iloc[0]["embedding"]),
+            profile=profile
+        )
     
     movie_points = prepare_qdrant_points(
         embedding_df=embeddings_df,
-        point_details_df=data_df
+        point_details_df=data_df,
+        payload_fields=profile.payload_fields
     )
     
     upload_points(
@@ -2,6 +2,8 @@ import pandas as pd
 from transformers import AutoTokenizer, AutoModel
 from qdrant_client import QdrantClient
 
+from init_qdrant import COLLECTION_PROFILE
+
 class RecommendationConfig:
     """
     A singleton configuration class for managing resources and settings required for a recommendation system.
@@ -18,6 +20,8 @@ class RecommendationConfig:
         USER_COLLECTION_NAME: Name of the Qdrant collection for storing user data.
         USER_SEARCH_TOP_K: Number of top results to return for user searches.
         MOVIE_SEARCH_TOP_K: Number of top results to return for movie searches.
+        SEARCH_PARAMS: Qdrant search params matching the profile the collections were created with.
+        PAYLOAD_FIELDS: Payload fields returned by the searches, None returns the whole payload.
     """
     _instance = None
 
@@ -41,4 +45,7 @@ class RecommendationConfig:
         self.USER_COLLECTION_NAME = "user_collection"
 
         self.USER_SEARCH_TOP_K = 25
-        self.MOVIE_SEARCH_TOP_K = 10
\ No newline at end of file
+        self.MOVIE_SEARCH_TOP_K = 10
+
+        self.SEARCH_PARAMS = COLLECTION_PROFILE.search_params()
+        self.PAYLOAD_FIELDS = COLLECTION_PROFILE.payload_fields
\ No newline at end of file
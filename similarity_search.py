@@ -50,7 +50,9 @@ def search_similar(query: Union[str, List[float]], collection_name: str, top_k:
     nearest_neighbours = config.qclient.query_points(
         collection_name=collection_name,
         query=query_emb,
-        limit=top_k
+        limit=top_k,
+        search_params=config.SEARCH_PARAMS,
+        with_payload=config.PAYLOAD_FIELDS if config.PAYLOAD_FIELDS is not None else True
     )
 
     return nearest_neighbours
\ No newline at end of file